@@ -263,26 +263,66 @@ class CObfuscator:
         
         return '\n\n'.join(parts)
 
+def _obfuscate_file(input_file, output_file, reference_proxying, verbose):
+    """Obfuscate a single file - module-level so it can run in a worker process.
+
+    Args:
+        input_file: Path to the input C file
+        output_file: Path to the output file (None for the default)
+        reference_proxying: Whether to enable reference proxying
+        verbose: Whether to print verbose output
+    """
+    obfuscator = CObfuscator(
+        input_file=input_file,
+        output_file=output_file,
+        reference_proxying=reference_proxying,
+        verbose=verbose
+    )
+    obfuscator.obfuscate()
+
 def main():
     """Main entry point."""
     import argparse
-    
+
     parser = argparse.ArgumentParser(description="Obfuscate C code")
-    parser.add_argument("input_file", help="Input C file to obfuscate")
-    parser.add_argument("-o", "--output", help="Output file (default: input_file.obf)")
+    parser.add_argument("input_files", nargs="+", help="Input C file(s) to obfuscate")
+    parser.add_argument("-o", "--output", help="Output file (default: input_file.obf; only valid with a single input file)")
     parser.add_argument("-v", "--verbose", action="store_true", help="Verbose output")
     parser.add_argument("-n", "--no-proxying", action="store_true", help="Disable reference proxying")
-    
+
     args = parser.parse_args()
-    
-    # Create and run the obfuscator
-    obfuscator = CObfuscator(
-        input_file=args.input_file,
-        output_file=args.output,
-        reference_proxying=not args.no_proxying,
-        verbose=args.verbose
-    )
-    obfuscator.obfuscate()
+
+    if len(args.input_files) > 1 and args.output:
+        parser.error("-o/--output can only be used with a single input file")
+
+    if len(args.input_files) == 1:
+        _obfuscate_file(args.input_files[0], args.output, not args.no_proxying, args.verbose)
+        return
+
+    # Obfuscation of independent files is embarrassingly parallel and libclang
+    # parsing dominates the wall time, so fan the files out across processes.
+    # Each worker lazily builds its own libclang Index on first use
+    import concurrent.futures
+
+    max_workers = min(len(args.input_files), os.cpu_count() or 1)
+    with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(_obfuscate_file, path, None, not args.no_proxying, args.verbose): path
+            for path in args.input_files
+        }
+        failures = 0
+        for future in concurrent.futures.as_completed(futures):
+            path = futures[future]
+            try:
+                future.result()
+            except Exception as e:
+                print(f"Error obfuscating {path}: {e}")
+                failures += 1
+
+    # Match single-file mode, where an exception propagates and the process
+    # exits non-zero - callers must be able to detect partial failures
+    if failures:
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
@@ -6,7 +6,8 @@ import random
 import os
 import tempfile
 import re
-from typing import List, Dict, Set, Any, Optional
+from functools import lru_cache
+from typing import List, Dict, Set, Any, Optional, Tuple
 
 try:
     import clang.cindex
@@ -34,10 +35,13 @@ def find_function_dependencies_with_clang(code: str, functions: List[str]) -> Di
     # Create a set of function names for faster lookup
     function_set = set(functions)
     
-    # Create a temporary file to hold the code
-    with tempfile.NamedTemporaryFile(suffix='.c', delete=False) as temp_file:
-        temp_file.write(code.encode('utf-8'))
-        temp_file_path = temp_file.name
+    # Create a temporary file to hold the code - mkstemp plus a direct write
+    # skips the buffered-writer layers of NamedTemporaryFile
+    fd, temp_file_path = tempfile.mkstemp(suffix='.c')
+    try:
+        os.write(fd, code.encode('utf-8'))
+    finally:
+        os.close(fd)
     
     try:
         # Parse the code with clang
@@ -85,32 +89,39 @@ def topological_sort(functions: List[Dict[str, Any]], dependencies: Dict[str, Se
     # Create a copy of the dependencies
     deps_copy = {name: set(deps) for name, deps in dependencies.items()}
     
-    # List to store the sorted function names
+    # List to store the sorted function names, with a parallel set so
+    # membership checks on the fallback path below stay O(1)
     sorted_functions = []
-    
-    # Set of functions with no dependencies
-    no_deps = {name for name, deps in deps_copy.items() if not deps}
-    
-    while no_deps:
-        # Randomly select a function with no dependencies
-        func = random.choice(list(no_deps))
-        no_deps.remove(func)
+    added = set()
+
+    # List of functions with no dependencies; kept as a list so a random
+    # element can be removed with a swap-pop instead of copying the whole
+    # collection on every iteration
+    ready = [name for name, deps in deps_copy.items() if not deps]
+
+    while ready:
+        # Randomly select a function with no dependencies (swap-pop)
+        i = random.randrange(len(ready))
+        ready[i], ready[-1] = ready[-1], ready[i]
+        func = ready.pop()
         sorted_functions.append(func)
-        
+        added.add(func)
+
         # Remove this function from other functions' dependencies
-        for name, deps in list(deps_copy.items()):
+        for name, deps in deps_copy.items():
             if func in deps:
                 deps.remove(func)
                 if not deps:
-                    no_deps.add(name)
+                    ready.append(name)
     
     # Check for cyclic dependencies
     if len(sorted_functions) != len(deps_copy):
         if verbose:
             print("Warning: Cyclic dependencies detected, sorting may be incomplete")
-        # Add remaining functions in any order
-        remaining = set(deps_copy.keys()) - set(sorted_functions)
-        sorted_functions.extend(list(remaining))
+        # Add remaining functions in a random order
+        remaining = [name for name in deps_copy if name not in added]
+        random.shuffle(remaining)
+        sorted_functions.extend(remaining)
     
     return sorted_functions
 
@@ -196,36 +207,66 @@ def scramble_functions(functions: Dict[str, Dict], dependencies: Dict[str, List[
             if verbose:
                 print(f"Added {func_name} to sorted functions")
     
-    # Add functions in a way that respects dependencies
-    while len(added) < len(function_names):
-        # Pick a random function that hasn't been added yet
-        remaining = [f for f in function_names if f not in added]
-        if not remaining:
-            break
-        next_func = random.choice(remaining)
-        
-        # Add it with its dependencies
+    # Add functions in a way that respects dependencies. A single shuffled
+    # pass gives the same randomized order without recomputing the list of
+    # remaining functions on every iteration; add_function_with_deps skips
+    # names that were already added as dependencies of earlier picks.
+    order = list(function_names)
+    random.shuffle(order)
+    for next_func in order:
         add_function_with_deps(next_func)
     
     return sorted_functions
 
 
+def _freeze_dependencies(dependencies: Dict[str, List[str]]) -> Tuple[Tuple[str, Tuple[str, ...]], ...]:
+    """Freeze a dependency mapping into a hashable form usable as a cache key
+
+    Args:
+        dependencies: Dictionary mapping function names to lists of dependencies
+
+    Returns:
+        Tuple of (name, dependency tuple) pairs in sorted order
+    """
+    return tuple(sorted((name, tuple(deps)) for name, deps in dependencies.items()))
+
+
+@lru_cache(maxsize=None)
+def _depends_on_cached(func1: str, func2: str, frozen_deps: Tuple[Tuple[str, Tuple[str, ...]], ...]) -> bool:
+    """Memoized recursive dependency check over a frozen dependency mapping
+
+    Args:
+        func1: First function name
+        func2: Second function name
+        frozen_deps: Frozen dependency mapping from _freeze_dependencies
+
+    Returns:
+        True if func1 depends on func2, False otherwise
+    """
+    deps = dict(frozen_deps).get(func1, ())
+    if func2 in deps:
+        return True
+
+    for dependency in deps:
+        if _depends_on_cached(dependency, func2, frozen_deps):
+            return True
+
+    return False
+
+
 def depends_on(func1: str, func2: str, dependencies: Dict[str, List[str]]) -> bool:
     """Check if func1 depends on func2 directly or indirectly
-    
+
+    The recursive walk is memoized so repeated queries against the same
+    dependency mapping don't re-explore shared subgraphs (exponential in the
+    worst case for diamond-shaped dependencies).
+
     Args:
         func1: First function name
         func2: Second function name
         dependencies: Dictionary mapping function names to lists of dependencies
-        
+
     Returns:
         True if func1 depends on func2, False otherwise
     """
-    if func2 in dependencies.get(func1, []):
-        return True
-    
-    for dependency in dependencies.get(func1, []):
-        if depends_on(dependency, func2, dependencies):
-            return True
-    
-    return False 
\ No newline at end of file
+    return _depends_on_cached(func1, func2, _freeze_dependencies(dependencies)) 
\ No newline at end of file
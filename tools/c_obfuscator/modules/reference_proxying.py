@@ -2,10 +2,12 @@
 Reference Proxying Module - Handles creation of proxy functions and call replacements
 """
 
+from array import array
+from collections import Counter
+from functools import lru_cache
 from typing import Dict, List, Tuple, Set, Optional
 import hashlib
-import os
-import tempfile
+import re
 import sys
 
 try:
@@ -23,165 +25,397 @@ except ImportError:
     sys.exit(1)  # Exit immediately if clang is not available
 
 
-def create_temp_file(code: str) -> str:
-    """Create a temporary file with the given code.
-    
+# Name given to the in-memory buffer handed to libclang via unsaved_files
+_UNSAVED_FILENAME = 'input.c'
+
+# Single libclang Index shared by all parses in this module - recreating the
+# libclang handle on every call is pure overhead
+_clang_index = None
+
+
+def _get_index():
+    """Return the module-wide libclang Index, creating it on first use
+
+    Returns:
+        The shared clang.cindex.Index instance
+    """
+    global _clang_index
+    if _clang_index is None:
+        _clang_index = clang.cindex.Index.create()
+    return _clang_index
+
+
+def _parse_code(code: str, options: int = 0):
+    """Parse C code entirely in memory via libclang's unsaved_files
+
+    Avoids the temp-file round-trip (open/write/close/unlink) previously done
+    for every parse.
+
     Args:
-        code: The code to write to the file
-        
+        code: C code to parse
+        options: TranslationUnit parse options
+
     Returns:
-        Path to the temporary file
+        The parsed clang.cindex.TranslationUnit
+    """
+    return _get_index().parse(
+        _UNSAVED_FILENAME,
+        args=['-x', 'c'],
+        unsaved_files=[(_UNSAVED_FILENAME, code)],
+        options=options
+    )
+
+
+# Memoized results of _parse_function_with_clang keyed by (content hash,
+# function name) - the same declarations get parsed repeatedly across files
+# that share headers, and a cache hit skips libclang entirely
+_parse_function_cache = {}
+_PARSE_FUNCTION_CACHE_MAX = 4096
+
+
+def _cache_parsed_function(cache_key, return_type: Optional[str], params: Optional[List[str]]) -> None:
+    """Store a parse result, resetting the cache if it grows too large
+
+    Args:
+        cache_key: Key from the content hash and function name
+        return_type: Parsed return type (or None on failure)
+        params: Parsed argument list (or None on failure)
     """
-    with tempfile.NamedTemporaryFile(suffix='.c', delete=False) as temp_file:
-        temp_file.write(code.encode('utf-8'))
-        return temp_file.name
+    if len(_parse_function_cache) >= _PARSE_FUNCTION_CACHE_MAX:
+        _parse_function_cache.clear()
+    _parse_function_cache[cache_key] = (return_type, params)
 
 
 def _parse_function_with_clang(code: str, function_name: str) -> Tuple[Optional[str], Optional[List[str]]]:
     """
     Parse a function using libclang to extract return type and arguments.
-    
+
+    Results are memoized by a short content hash of the code, so repeated
+    parses of identical function text return without invoking libclang.
+
     Args:
         code: Code containing the function declaration or definition
         function_name: Name of the function to parse
-        
+
     Returns:
         Tuple of (return_type, argument_list)
     """
-    # Create a temporary file to hold the code
-    temp_file_path = create_temp_file(code)
-    
-    try:
-        # Parse the code with clang
-        index = clang.cindex.Index.create()
-        tu = index.parse(temp_file_path)
-        
-        # Find the function declaration/definition
-        function_cursor = None
-        for cursor in tu.cursor.walk_preorder():
-            if (cursor.kind == CursorKind.FUNCTION_DECL and 
-                cursor.spelling == function_name):
-                function_cursor = cursor
-                break
-        
-        if not function_cursor:
-            return None, None
-        
-        # Extract the original tokens to get the exact return type as written in source
-        tokens = list(function_cursor.get_tokens())
-        
-        # Extract the return type from tokens
-        return_type = ""
-        for i, token in enumerate(tokens):
-            if token.spelling == function_name:
-                # Found the function name, everything before it (excluding qualifiers) is the return type
-                return_type = " ".join(t.spelling for t in tokens[:i])
-                break
-                
-        if not return_type:
-            # Fallback to clang's result type spelling if we couldn't extract from tokens
-            return_type = function_cursor.result_type.spelling
-        
-        # Extract parameters exactly as they appear in source
-        params = []
-        token_params = []
-        in_params = False
-        param_text = ""
-        
-        # Extract parameter text from tokens
-        for token in tokens:
-            if token.spelling == '(':
-                in_params = True
-                continue
-            elif token.spelling == ')':
-                if param_text.strip():
-                    token_params.append(param_text.strip())
+    cache_key = (hashlib.blake2b(code.encode('utf-8'), digest_size=8).digest(), function_name)
+    if cache_key in _parse_function_cache:
+        return _parse_function_cache[cache_key]
+
+    # Parse the code in memory with clang - only the signature is needed
+    # here, so skip parsing the function bodies
+    tu = _parse_code(code, options=clang.cindex.TranslationUnit.PARSE_SKIP_FUNCTION_BODIES)
+
+    # Find the function declaration/definition
+    function_cursor = None
+    for cursor in tu.cursor.walk_preorder():
+        if (cursor.kind == CursorKind.FUNCTION_DECL and
+            cursor.spelling == function_name):
+            function_cursor = cursor
+            break
+
+    if not function_cursor:
+        _cache_parsed_function(cache_key, None, None)
+        return None, None
+
+    # Stream the tokens once instead of materializing them all up front -
+    # every Token wrapper crosses the Python/C boundary, and most of the
+    # function's tokens (the body) are never needed
+    token_iter = function_cursor.get_tokens()
+
+    # Everything between the start of the declaration and the function name
+    # token is the return type - slice it straight out of the source, which
+    # preserves the original formatting and avoids per-token allocations
+    return_type = ""
+    decl_start = function_cursor.extent.start.offset
+    for token in token_iter:
+        if token.spelling == function_name:
+            return_type = code[decl_start:token.extent.start.offset].rstrip()
+            break
+
+    if not return_type:
+        # Fallback to clang's result type spelling if we couldn't extract from tokens
+        return_type = function_cursor.result_type.spelling
+
+    # Extract parameters exactly as they appear in source, continuing the
+    # same token stream from just after the function name
+    params = []
+    token_params = []
+    in_params = False
+    param_text = ""
+
+    for token in token_iter:
+        if token.spelling == '(':
+            in_params = True
+            continue
+        elif token.spelling == ')':
+            if param_text.strip():
+                token_params.append(param_text.strip())
+            break
+
+        if in_params:
+            if token.spelling == ',':
+                token_params.append(param_text.strip())
+                param_text = ""
+            else:
+                param_text += token.spelling + " "
+
+    # If we extracted parameters from tokens, use those
+    if token_params:
+        params = token_params
+    else:
+        # Fallback to clang's argument extraction
+        for param in function_cursor.get_arguments():
+            param_type = param.type.spelling
+            param_name = param.spelling
+            params.append(f"{param_type} {param_name}")
+
+    _cache_parsed_function(cache_key, return_type, params)
+    return return_type, params
+
+
+def _collect_functions_and_calls(code: str, function_names: List[str], verbose: bool = False) -> Tuple[Dict[str, Dict], Tuple[array, array, array]]:
+    """
+    Parse the code once with clang and collect both function signatures and
+    call positions in a single AST walk.
+
+    This replaces the per-function re-parsing previously done by
+    _parse_function_with_clang plus the extra whole-program parse in
+    find_function_calls_with_clang: for N functions that was N+1 full libclang
+    parses of essentially the same code, and the parse is the hot path.
+
+    Call sites are packed into three flat array('i') columns (function index,
+    start offset, end offset) instead of a dict of lists of tuples - each
+    tuple would cost ~64 bytes of object overhead per call, while the columns
+    store plain contiguous ints.
+
+    Args:
+        code: C code to analyze
+        function_names: Names of the functions of interest
+        verbose: Whether to print verbose output
+
+    Returns:
+        Tuple of (signatures, (func_idx, starts, ends)) where signatures maps
+        function names to {'return_type': str, 'params': [(type, name), ...]}
+        and the columns record one call site per element, with func_idx
+        indexing into function_names
+    """
+    name_index = {name: i for i, name in enumerate(function_names)}
+
+    # Parse the code in memory with clang - a full parse, since call
+    # expressions live inside function bodies
+    tu = _parse_code(code)
+
+    signatures = {}
+    func_idx = array('i')
+    starts = array('i')
+    ends = array('i')
+
+    # Single preorder walk collecting declarations and call sites
+    for cursor in tu.cursor.walk_preorder():
+        if cursor.kind == CursorKind.FUNCTION_DECL:
+            name = cursor.spelling
+            if name in name_index and (name not in signatures or cursor.is_definition()):
+                # Use clang's typed API rather than re-scanning tokens
+                params = [(param.type.spelling, param.spelling)
+                          for param in cursor.get_arguments()]
+                signatures[name] = {
+                    'return_type': cursor.result_type.spelling,
+                    'params': params
+                }
+        elif cursor.kind == CursorKind.CALL_EXPR:
+            index = name_index.get(cursor.spelling)
+            if index is not None:
+                extent = cursor.extent
+                func_idx.append(index)
+                starts.append(extent.start.offset)
+                ends.append(extent.end.offset)
+
+    if verbose:
+        print(f"Collected {len(signatures)} function signatures in one clang pass")
+        for index, count in sorted(Counter(func_idx).items()):
+            print(f"Found {count} calls to function {function_names[index]}")
+
+    return signatures, (func_idx, starts, ends)
+
+
+# Identifier immediately preceding the prototype parenthesis
+_TRAILING_IDENTIFIER_RE = re.compile(r'[A-Za-z_][A-Za-z0-9_]*$')
+
+
+def _format_parameter(param_type: str, param_name: str) -> str:
+    """Render a typed parameter as valid C, splicing the name into the
+    declarator
+
+    clang spells suffix declarators with the name position empty - e.g.
+    "char [16]" or "int (*)(int)" - so pasting the name after the spelling
+    produces invalid C. The name goes before the array brackets or inside
+    the pointer parentheses instead.
+
+    Args:
+        param_type: Type spelling from clang
+        param_name: Parameter name (may be empty for unnamed parameters)
+
+    Returns:
+        The parameter declaration as it would appear in a prototype
+    """
+    if not param_name:
+        return param_type
+
+    # Function pointers and pointers to arrays: "int (*)(int)" -> "int (*fn)(int)"
+    if '(*)' in param_type:
+        return param_type.replace('(*)', f'(*{param_name})', 1)
+
+    # Arrays: "char [16]" -> "char buf[16]"
+    bracket = param_type.find('[')
+    if bracket != -1:
+        return f"{param_type[:bracket].rstrip()} {param_name}{param_type[bracket:]}"
+
+    return f"{param_type} {param_name}"
+
+
+def _scan_function_declaration(declaration: str) -> Optional[Tuple[str, str, List[str]]]:
+    """
+    Extract return type, name, and arguments from a declaration with a small
+    handwritten scan instead of a libclang parse.
+
+    Args:
+        declaration: Function declaration string
+
+    Returns:
+        Tuple of (return_type, function_name, argument_list), or None when
+        the declaration doesn't match a simple prototype shape
+    """
+    decl = declaration.strip()
+    if decl.endswith(';'):
+        decl = decl[:-1].rstrip()
+
+    # Find the prototype parenthesis: the '(' matching the last ')'
+    close = decl.rfind(')')
+    if close == -1:
+        return None
+
+    depth = 0
+    open_paren = -1
+    for i in range(close, -1, -1):
+        if decl[i] == ')':
+            depth += 1
+        elif decl[i] == '(':
+            depth -= 1
+            if depth == 0:
+                open_paren = i
                 break
-            
-            if in_params:
-                if token.spelling == ',':
-                    token_params.append(param_text.strip())
-                    param_text = ""
-                else:
-                    param_text += token.spelling + " "
-        
-        # If we extracted parameters from tokens, use those
-        if token_params:
-            params = token_params
-        else:
-            # Fallback to clang's argument extraction
-            for param in function_cursor.get_arguments():
-                param_type = param.type.spelling
-                param_name = param.spelling
-                params.append(f"{param_type} {param_name}")
-        
-        return return_type, params
-    
-    finally:
-        # Clean up the temporary file
-        if os.path.exists(temp_file_path):
-            os.unlink(temp_file_path)
+
+    if open_paren <= 0:
+        return None
+
+    # The identifier just before the parenthesis is the function name;
+    # everything left of it is the return type
+    head = decl[:open_paren].rstrip()
+    match = _TRAILING_IDENTIFIER_RE.search(head)
+    if not match:
+        return None
+
+    function_name = match.group(0)
+    return_type = head[:match.start()].strip()
+    if not return_type:
+        return None
+
+    # Split the argument list on top-level commas
+    args_text = decl[open_paren + 1:close].strip()
+    args = []
+    if args_text:
+        depth = 0
+        last = 0
+        for i, char in enumerate(args_text):
+            if char in '([':
+                depth += 1
+            elif char in ')]':
+                depth -= 1
+            elif char == ',' and depth == 0:
+                args.append(args_text[last:i].strip())
+                last = i + 1
+        args.append(args_text[last:].strip())
+
+    return return_type, function_name, args
 
 
 def _parse_function_declaration(declaration: str) -> Tuple[Optional[str], Optional[str], Optional[List[str]]]:
     """
     Parse a function declaration to extract return type, name, and arguments.
-    
+
+    A handwritten scan handles the common prototype shapes without spinning
+    up libclang; clang is kept as the fallback for anything the scan can't
+    handle.
+
     Args:
         declaration: Function declaration string
-        
+
     Returns:
         Tuple of (return_type, function_name, argument_list)
     """
-    # Use clang to find the function name from the declaration
-    temp_file_path = create_temp_file(declaration)
-    
-    try:
-        # Parse the code with clang
-        index = clang.cindex.Index.create()
-        tu = index.parse(temp_file_path)
-        
-        # Find the function declaration
-        for cursor in tu.cursor.walk_preorder():
-            if cursor.kind == CursorKind.FUNCTION_DECL:
-                function_name = cursor.spelling
-                # Now use clang to get the details
-                return_type, args = _parse_function_with_clang(declaration, function_name)
-                return return_type, function_name, args
-        
-        # If we didn't find a function declaration, return None
-        return None, None, None
-    
-    finally:
-        # Clean up the temporary file
-        if os.path.exists(temp_file_path):
-            os.unlink(temp_file_path)
+    parsed = _scan_function_declaration(declaration)
+    if parsed is not None:
+        return parsed
+
+    # Fallback: use clang to find the function name from the declaration.
+    # A declaration has no body to parse, so skip bodies here as well
+    tu = _parse_code(declaration, options=clang.cindex.TranslationUnit.PARSE_SKIP_FUNCTION_BODIES)
+
+    # Find the function declaration
+    for cursor in tu.cursor.walk_preorder():
+        if cursor.kind == CursorKind.FUNCTION_DECL:
+            function_name = cursor.spelling
+            # Now use clang to get the details
+            return_type, args = _parse_function_with_clang(declaration, function_name)
+            return return_type, function_name, args
+
+    # If we didn't find a function declaration, return None
+    return None, None, None
 
 
+@lru_cache(maxsize=None)
 def _generate_proxy_name(function_name: str) -> str:
     """Generate a proxy function name based on the original name and its hash
-    
+
+    Cached so the hash is computed once per unique name across files.
+
     Args:
         function_name: The original function name
-        
+
     Returns:
         A proxy name like "original_name_XXXXXXXX"
     """
-    # Generate a short hash of the function name
-    hash_obj = hashlib.md5(function_name.encode())
+    # Generate a short hash of the function name - SHA-256 dispatches to
+    # hardware-accelerated code where OpenSSL supports it, unlike MD5
+    hash_obj = hashlib.sha256(function_name.encode())
     # Take the first 8 characters of the hex digest
     hash_str = hash_obj.hexdigest()[:8].upper()
     
     return f"{function_name}_{hash_str}"
 
 
-def create_proxy_definitions(functions: Dict[str, Dict], verbose: bool = False) -> Tuple[List[str], Dict[str, str]]:
+# Proxy templates - one .format call per function instead of building each
+# definition from chained f-string concatenations
+_PROXY_TEMPLATE_RET = "{return_type} {proxy_name}({params}) {{\n    return {original}({call_args});\n}}"
+_PROXY_TEMPLATE_VOID = "{return_type} {proxy_name}({params}) {{\n    {original}({call_args});\n}}"
+
+# Only skip the actual main function, nothing else
+_SKIP_FUNCTIONS = frozenset({"main"})
+
+
+def create_proxy_definitions(functions: Dict[str, Dict], verbose: bool = False, signatures: Optional[Dict[str, Dict]] = None) -> Tuple[List[str], Dict[str, str]]:
     """Create proxy function definitions for all functions
-    
+
     Args:
         functions: Dictionary of functions (name -> function info)
         verbose: Whether to print verbose output
-        
+        signatures: Optional pre-collected signatures from
+            _collect_functions_and_calls; functions missing from it fall back
+            to a per-function clang parse
+
     Returns:
         Tuple of (list of proxy function definitions, mapping of original function names to proxy names)
     """
@@ -193,45 +427,56 @@ def create_proxy_definitions(functions: Dict[str, Dict], verbose: bool = False)
     
     # Map original function names to proxy names
     proxy_names = {}
-    
-    # Only skip actual main function, nothing else
-    skip_functions = ["main"]
-    
+
     for func_name, func_info in functions.items():
         if verbose:
             print(f"Function {func_name} has keys: {list(func_info.keys())}")
-            
-        # Skip the actual main function, but process everything else
-        if func_name.lower() == "main":
+
+        # Skip the actual main function, but process everything else. The
+        # exact-match check hits first so the common case skips the
+        # lowercased-copy allocation
+        if func_name in _SKIP_FUNCTIONS or func_name.lower() in _SKIP_FUNCTIONS:
             if verbose:
                 print(f"Skipping proxy for {func_name} - main function")
             continue
-            
-        # Use function text to extract information
-        if 'text' not in func_info:
+
+        # Parse the function declaration to get return type, name, and
+        # arguments - one dict lookup for the function text
+        function_text = func_info.get('text')
+        if function_text is None:
             if verbose:
                 print(f"Skipping proxy for {func_name} - missing function text")
             continue
-            
-        # Parse the function declaration to get return type, name, and arguments
-        function_text = func_info['text']
-        
-        # First try to parse the function using _parse_function_with_clang
-        try:
-            return_type, args = _parse_function_with_clang(function_text, func_name)
-            
-            if return_type is None or args is None:
+
+        # Prefer the signature collected by the single whole-program clang
+        # pass; its typed (type, name) pairs give the parameter names directly
+        # without re-tokenizing argument strings. Fall back to a per-function
+        # parse only when it is missing
+        arg_names = None
+        if signatures is not None and func_name in signatures:
+            signature = signatures[func_name]
+            return_type = signature['return_type']
+            args = [_format_parameter(param_type, param_name)
+                    for param_type, param_name in signature['params']]
+            arg_names = [param_name or f"arg{i}"
+                         for i, (_, param_name) in enumerate(signature['params'])]
+        else:
+            try:
+                return_type, args = _parse_function_with_clang(function_text, func_name)
+
+                if return_type is None or args is None:
+                    if verbose:
+                        print(f"Skipping proxy for {func_name} - couldn't parse function with clang")
+                    continue
+
+            except Exception as e:
                 if verbose:
-                    print(f"Skipping proxy for {func_name} - couldn't parse function with clang")
+                    print(f"Error parsing function {func_name}: {e}")
                 continue
-                
-        except Exception as e:
-            if verbose:
-                print(f"Error parsing function {func_name}: {e}")
-            continue
         
-        # Determine if this is a void function - case insensitive check
-        is_void = return_type.lower() == "void" or return_type.upper() == "VOID"
+        # Determine if this is a void function - one case-insensitive
+        # comparison instead of separate lower() and upper() round-trips
+        is_void = return_type.strip().casefold() == "void"
         
         if verbose:
             print(f"Function {func_name} return type: {return_type}, is_void: {is_void}")
@@ -240,30 +485,34 @@ def create_proxy_definitions(functions: Dict[str, Dict], verbose: bool = False)
         proxy_name = _generate_proxy_name(func_name)
         proxy_names[func_name] = proxy_name
         
-        # Extract parameter names from args
-        arg_names = []
-        for arg in args:
-            # Try to find the parameter name in the argument string
-            param_parts = arg.split()
-            if param_parts:
-                # Get the last part as the name (may contain array brackets)
-                last_part = param_parts[-1]
-                # Remove any array brackets
-                name = last_part.split('[')[0]
-                arg_names.append(name)
-            else:
-                # If we can't parse the argument, use a placeholder
-                arg_names.append(f"arg{len(arg_names)}")
-        
-        # Start with function signature - EXACTLY as it appears in the original
-        proxy_definition = f"{return_type} {proxy_name}({', '.join(args if args else ['void'])}) {{"
+        # Extract parameter names from the argument strings when the typed
+        # signature didn't provide them (fallback parse path only)
+        if arg_names is None:
+            arg_names = []
+            for arg in args:
+                # Try to find the parameter name in the argument string
+                param_parts = arg.split()
+                if param_parts:
+                    # Get the last part as the name (may contain array brackets)
+                    last_part = param_parts[-1]
+                    # Remove any array brackets
+                    name = last_part.split('[')[0]
+                    arg_names.append(name)
+                else:
+                    # If we can't parse the argument, use a placeholder
+                    arg_names.append(f"arg{len(arg_names)}")
         
-        # Add function body that calls the original function
-        if is_void:
-            # For void functions (lowercase void or uppercase VOID), don't use return
-            proxy_definition += f"\n    {func_name}({', '.join(arg_names)});\n}}"
-        else:
-            proxy_definition += f"\n    return {func_name}({', '.join(arg_names)});\n}}"
+        # Emit the proxy in one shot - the signature keeps the parameters
+        # EXACTLY as they appear in the original, and void functions (lowercase
+        # void or uppercase VOID) get a body without a return statement
+        template = _PROXY_TEMPLATE_VOID if is_void else _PROXY_TEMPLATE_RET
+        proxy_definition = template.format(
+            return_type=return_type,
+            proxy_name=proxy_name,
+            params=', '.join(args) if args else 'void',
+            original=func_name,
+            call_args=', '.join(arg_names)
+        )
         
         if verbose:
             print(f"Created proxy for {func_name} -> {proxy_name}")
@@ -291,59 +540,32 @@ def find_function_calls_with_clang(code: str, functions: List[str], verbose: boo
     """
     # Create a set of function names for faster lookup
     function_set = set(functions)
-    
-    # Create a temporary file to hold the code
-    temp_file_path = create_temp_file(code)
-    
-    try:
-        # Parse the code with clang
-        index = clang.cindex.Index.create()
-        tu = index.parse(temp_file_path)
-        
-        # Dictionary to hold function call positions
-        call_positions = {func: [] for func in functions}
-        
-        # Find all function call expressions
-        for cursor in tu.cursor.walk_preorder():
-            if cursor.kind == CursorKind.CALL_EXPR:
-                called_func_name = cursor.spelling
-                
-                # If this is one of the functions we're looking for
-                if called_func_name in function_set:
-                    # Get the exact source range from tokens
-                    tokens = list(cursor.get_tokens())
-                    if tokens:
-                        # Find the function name and opening parenthesis
-                        for i, token in enumerate(tokens):
-                            if token.spelling == called_func_name and i + 1 < len(tokens) and tokens[i+1].spelling == '(':
-                                start_pos = token.extent.start.offset
-                                # Find the closing parenthesis which marks the end of the call
-                                end_pos = None
-                                paren_count = 0
-                                for j in range(i+1, len(tokens)):
-                                    if tokens[j].spelling == '(':
-                                        paren_count += 1
-                                    elif tokens[j].spelling == ')':
-                                        paren_count -= 1
-                                        if paren_count == 0:
-                                            end_pos = tokens[j].extent.end.offset
-                                            break
-                                
-                                if end_pos:
-                                    call_positions[called_func_name].append((start_pos, end_pos))
-                                break
-        
-        if verbose:
-            for func, positions in call_positions.items():
-                if positions:
-                    print(f"Found {len(positions)} calls to function {func}")
-        
-        return call_positions
-    
-    finally:
-        # Clean up the temporary file
-        if os.path.exists(temp_file_path):
-            os.unlink(temp_file_path)
+
+    # Parse the code in memory with clang - this must be a full parse, since
+    # the call expressions being collected live inside function bodies
+    tu = _parse_code(code)
+
+    # Dictionary to hold function call positions
+    call_positions = {func: [] for func in functions}
+
+    # Find all function call expressions
+    for cursor in tu.cursor.walk_preorder():
+        if cursor.kind == CursorKind.CALL_EXPR:
+            called_func_name = cursor.spelling
+
+            # If this is one of the functions we're looking for, the cursor
+            # extent already spans the whole call expression - no token scan
+            # is needed to find the closing parenthesis
+            if called_func_name in function_set:
+                extent = cursor.extent
+                call_positions[called_func_name].append((extent.start.offset, extent.end.offset))
+
+    if verbose:
+        for func, positions in call_positions.items():
+            if positions:
+                print(f"Found {len(positions)} calls to function {func}")
+
+    return call_positions
 
 
 def apply_reference_proxying(code: str, functions: Dict[str, Dict], verbose: bool = False) -> Tuple[str, List[str]]:
@@ -360,36 +582,40 @@ def apply_reference_proxying(code: str, functions: Dict[str, Dict], verbose: boo
     """
     if verbose:
         print("Applying reference proxying...")
-    
+
+    # Parse the whole translation unit exactly once, collecting both the
+    # function signatures and every call site in a single AST walk
+    function_names = list(functions.keys())
+    signatures, (func_idx, starts, _) = _collect_functions_and_calls(code, function_names, verbose)
+
     # Create proxy function definitions and get mapping
-    proxy_definitions, proxy_mapping = create_proxy_definitions(functions, verbose)
-    
+    proxy_definitions, proxy_mapping = create_proxy_definitions(functions, verbose, signatures)
+
     # If no proxies were created, return the original code
     if not proxy_definitions:
         if verbose:
             print("No proxy functions created, returning original code")
         return code, []
-    
-    # Find all function calls in the code and get their positions
-    function_calls = find_function_calls_with_clang(code, list(proxy_mapping.keys()), verbose)
-    
-    # Apply replacements in reverse order to avoid messing up positions
-    result = code
-    for func_name, call_positions in function_calls.items():
-        # Skip if we don't have a proxy for this function
-        if func_name not in proxy_mapping:
-            continue
-            
-        # Get the proxy name
-        proxy_name = proxy_mapping[func_name]
-        
-        # Replace all calls in reverse order
-        for start, end in sorted(call_positions, reverse=True):
-            # Replace the function name with the proxy name
-            called_func = result[start:end]
-            if called_func.startswith(func_name):
-                # Replace function name but keep the rest of the call
-                proxied_call = proxy_name + called_func[len(func_name):]
-                result = result[:start] + proxied_call + result[end:]
-    
+
+    # Collect the clang-verified call-site start offsets from the packed
+    # columns. The regex scan below only renames identifiers at these
+    # offsets, so definitions, prototypes and unrelated identifiers keep
+    # their original names
+    call_starts = set()
+    for index, start in zip(func_idx, starts):
+        func_name = function_names[index]
+        if func_name in proxy_mapping and code.startswith(func_name, start):
+            call_starts.add(start)
+
+    if not call_starts:
+        return code, proxy_definitions
+
+    # One combined scan over the source rewrites every call in a single
+    # linear pass instead of one position sweep per function
+    pattern = re.compile(r'\b(' + '|'.join(map(re.escape, proxy_mapping)) + r')\b(?=\s*\()')
+    result = pattern.sub(
+        lambda match: proxy_mapping[match.group(1)] if match.start() in call_starts else match.group(0),
+        code
+    )
+
     return result, proxy_definitions 
\ No newline at end of file
@@ -2,9 +2,12 @@
 String Obfuscation Module - Handles string obfuscation in C code
 """
 
+import hashlib
+import multiprocessing
 import random
-import os
-import tempfile
+import re
+from functools import lru_cache, partial
+from itertools import cycle
 from typing import List, Dict, Any, Tuple
 
 try:
@@ -15,6 +18,21 @@ except ImportError:
     CLANG_AVAILABLE = False
     print("Warning: clang.cindex not available. String obfuscation will be limited.")
 
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    # NumPy only accelerates the byte arithmetic; the pure-Python fallback
+    # produces identical output
+    NUMPY_AVAILABLE = False
+
+try:
+    from numba import njit
+    # The JIT kernel operates on NumPy arrays, so it needs both packages
+    NUMBA_AVAILABLE = NUMPY_AVAILABLE
+except ImportError:
+    NUMBA_AVAILABLE = False
+
 
 def generate_encryption_key() -> List[int]:
     """Generate a random encryption key for string obfuscation
@@ -38,43 +56,92 @@ def generate_deobfuscation_function(encryption_key: List[int]) -> str:
     # Format the key as a comma-separated list of bytes
     key_str = ', '.join(str(b) for b in encryption_key)
     
-    # Create the deobfuscation function code without includes
-    deobf_function_body = f"""static char* deobfuscate_string(const unsigned char* obfuscated, size_t len) {{
+    # Create the deobfuscation function code without includes. The kernel is
+    # a byte-wise subtract modulo 256 with a 16-byte key, so each 16-byte
+    # block maps onto a single SSE2 _mm_sub_epi8 (32-byte blocks onto AVX2
+    # _mm256_sub_epi8 with the key broadcast to both halves); the scalar
+    # loop handles the tail and serves as the fallback without SIMD
+    deobf_function_body = f"""static char* deobfuscate_string(const unsigned char* restrict obfuscated, size_t len) {{
     static unsigned char key[16] = {{{key_str}}};
-    char* result = (char*)malloc(len + 1);
+    char* restrict result = (char*)malloc(len + 1);
     if (!result) return NULL;
-    
-    for (size_t i = 0; i < len; i++) {{
-        unsigned char k = key[i % 16];
-        result[i] = (char)((obfuscated[i] + (256 - k)) % 256);
+
+    size_t i = 0;
+#ifdef __AVX2__
+    __m256i vkey2 = _mm256_broadcastsi128_si256(_mm_loadu_si128((const __m128i*)key));
+    for (; i + 32 <= len; i += 32) {{
+        __m256i block2 = _mm256_loadu_si256((const __m256i*)(obfuscated + i));
+        _mm256_storeu_si256((__m256i*)(result + i), _mm256_sub_epi8(block2, vkey2));
+    }}
+#endif
+#ifdef __SSE2__
+    __m128i vkey = _mm_loadu_si128((const __m128i*)key);
+    for (; i + 16 <= len; i += 16) {{
+        __m128i block = _mm_loadu_si128((const __m128i*)(obfuscated + i));
+        _mm_storeu_si128((__m128i*)(result + i), _mm_sub_epi8(block, vkey));
+    }}
+#endif
+#ifdef __GNUC__
+#pragma GCC ivdep
+#endif
+    for (; i < len; i++) {{
+        result[i] = (char)(obfuscated[i] - key[i & 15]);
     }}
     result[len] = '\\0';
-    
+
     return result;
 }}"""
-    
-    # Create the full deobfuscation function with includes and comment
+
+    # Create the full deobfuscation function with includes and comment.
+    # The SIMD includes are spelled "# include" (legal C - whitespace may
+    # follow the #) so the include-hoisting passes, which match lines
+    # starting with "#include", leave them inside their architecture guard
+    # instead of lifting them unconditionally to the top of the file
     deobf_function = f"""/* String deobfuscation function */
 #include <stdlib.h>
 #include <string.h>
+#ifdef __AVX2__
+# include <immintrin.h>
+#elif defined(__SSE2__)
+# include <emmintrin.h>
+#endif
 
 {deobf_function_body}"""
     
     return deobf_function
 
 
-def create_temp_file(code: str) -> str:
-    """Create a temporary file with the given code.
-    
-    Args:
-        code: The code to write to the file
-        
+# Compiled once at import - re.compile inside the per-string loops would pay
+# the module-cache lookup and argument parsing on every call. The unrolled
+# form (plain run, then escape-plus-run repeated) matches the same literals
+# as the alternation r'"(?:[^"\\]|\\.)*"' but never revisits a character, so
+# long literals and pathological backslash runs scan in one linear pass.
+# DOTALL lets the escape consume a backslash-newline line splice
+_STRING_LITERAL_RE = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+
+
+# Name given to the in-memory buffer handed to libclang via unsaved_files
+_UNSAVED_FILENAME = 'input.c'
+
+# Single libclang Index shared by all parses in this module
+_clang_index = None
+
+# Memoized get_string_literals results keyed by a short content hash, so
+# consecutive pipeline stages scanning the same text share one parse
+_string_literal_cache = {}
+_STRING_LITERAL_CACHE_MAX = 64
+
+
+def _get_index():
+    """Return the module-wide libclang Index, creating it on first use
+
     Returns:
-        Path to the temporary file
+        The shared clang.cindex.Index instance
     """
-    with tempfile.NamedTemporaryFile(suffix='.c', delete=False) as temp_file:
-        temp_file.write(code.encode('utf-8'))
-        return temp_file.name
+    global _clang_index
+    if _clang_index is None:
+        _clang_index = clang.cindex.Index.create()
+    return _clang_index
 
 
 def get_includes(code: str) -> List[str]:
@@ -105,139 +172,431 @@ def get_string_literals(code: str, verbose: bool = False) -> List[Dict[str, Any]
         List of string literals with positions
     """
     if not CLANG_AVAILABLE:
+        # Fall back to the precompiled literal regex - one pass through the
+        # C-coded regex engine instead of giving up entirely
+        string_literals = [
+            {'text': match.group(0), 'start': match.start(), 'end': match.end()}
+            for match in _STRING_LITERAL_RE.finditer(code)
+        ]
         if verbose:
-            print("Warning: clang.cindex not available. String extraction will be limited.")
-        return []
-    
-    temp_file_path = create_temp_file(code)
-    
-    try:
-        # Parse the code with clang
-        index = clang.cindex.Index.create()
-        tu = index.parse(temp_file_path, args=['-x', 'c'])
-        
-        string_literals = []
-        
-        # Find all string literals
-        for token in tu.get_tokens(extent=tu.cursor.extent):
-            if token.kind == TokenKind.LITERAL and token.spelling.startswith('"'):
-                # This is a string literal
-                string_literals.append({
-                    'text': token.spelling,
-                    'start': token.extent.start.offset,
-                    'end': token.extent.end.offset
-                })
-        
-        if verbose:
-            print(f"Found {len(string_literals)} string literals using clang")
-        
+            print(f"Found {len(string_literals)} string literals using regex fallback")
         return string_literals
-    
-    finally:
-        # Clean up the temporary file
-        if os.path.exists(temp_file_path):
-            os.unlink(temp_file_path)
+
+    # Back-to-back pipeline stages often scan the same text; a content-hash
+    # cache lets them share one parse
+    cache_key = hashlib.blake2b(code.encode('utf-8'), digest_size=8).digest()
+    if cache_key in _string_literal_cache:
+        if verbose:
+            print(f"Found {len(_string_literal_cache[cache_key])} string literals (cached)")
+        return _string_literal_cache[cache_key]
+
+    # Parse the code in memory with clang via unsaved_files - no temp-file
+    # round-trip per call. Only the token stream is needed here, so function
+    # bodies don't have to be fully parsed
+    tu = _get_index().parse(
+        _UNSAVED_FILENAME,
+        args=['-x', 'c'],
+        unsaved_files=[(_UNSAVED_FILENAME, code)],
+        options=(clang.cindex.TranslationUnit.PARSE_SKIP_FUNCTION_BODIES |
+                 clang.cindex.TranslationUnit.PARSE_DETAILED_PROCESSING_RECORD)
+    )
+
+    string_literals = []
+
+    # Find all string literals
+    for token in tu.get_tokens(extent=tu.cursor.extent):
+        if token.kind == TokenKind.LITERAL and token.spelling.startswith('"'):
+            # This is a string literal
+            string_literals.append({
+                'text': token.spelling,
+                'start': token.extent.start.offset,
+                'end': token.extent.end.offset
+            })
+
+    if verbose:
+        print(f"Found {len(string_literals)} string literals using clang")
+
+    if len(_string_literal_cache) >= _STRING_LITERAL_CACHE_MAX:
+        _string_literal_cache.clear()
+    _string_literal_cache[cache_key] = string_literals
+
+    return string_literals
+
+
+# Combined literal payload (in source bytes) below which the process pool
+# is not worth its startup and pickling cost
+_PARALLEL_MIN_PAYLOAD = 1 << 20
 
 
-def obfuscate_strings_in_text(text: str, encryption_key: List[int], verbose: bool = False) -> str:
+def _decode_escapes(string_content: str) -> str:
+    """Decode C escape sequences in a literal's content
+
+    Without a backslash the literal already is its decoded form, so the
+    encode/decode pair (two allocations per string) is skipped entirely.
+
+    Args:
+        string_content: Literal content with the surrounding quotes removed
+
+    Returns:
+        The decoded string, or the input unchanged if decoding fails
+    """
+    if '\\' not in string_content:
+        return string_content
+    try:
+        return bytes(string_content, 'utf-8').decode('unicode_escape')
+    except:
+        # If we can't process escape sequences, use the original string
+        return string_content
+
+
+def obfuscate_strings_in_text(text: str, encryption_key: List[int], verbose: bool = False, use_string_table: bool = True) -> str:
     """Obfuscate string literals in the given text
-    
+
     Args:
         text: C code text to process
         encryption_key: The encryption key to use
         verbose: Whether to print verbose output
-        
+        use_string_table: Emit one static const table per unique string and
+            reference it by name at each call site, instead of repeating an
+            inline compound literal (smaller generated C, deduplicated data)
+
     Returns:
         Text with string literals obfuscated
     """
-    # Make a copy of the original text
-    result = text
-    
-    # Find all string literals in the result
-    string_literals = get_string_literals(result, verbose)
-    
-    # We need to process matches in reverse order to avoid invalidating offsets
-    for string_lit in sorted(string_literals, key=lambda x: x['start'], reverse=True):
+    # A plain substring check is far cheaper than a parse or regex pass, and
+    # text with no quote character cannot contain a string literal
+    if '"' not in text:
+        return text
+
+    # Find all string literals in the text
+    string_literals = get_string_literals(text, verbose)
+
+    # Collect the replacements as (start, end, text) edits against the
+    # original offsets, then rebuild the text in one forward pass - splicing
+    # per string copies the whole file each time. get_string_literals walks
+    # the token stream in source order, so the edits arrive pre-sorted
+    edits = []
+
+    # When the combined literal payload is large, obfuscating the unique
+    # contents is embarrassingly parallel - fan it out across a process pool
+    # so the sequential loop below finds every result precomputed. Small
+    # inputs skip this; pool startup would dominate
+    obf_map = {}
+    if sum(lit['end'] - lit['start'] for lit in string_literals) >= _PARALLEL_MIN_PAYLOAD:
+        seen = set()
+        unique = []
+        for string_lit in string_literals:
+            content = string_lit['text']
+            if len(content) <= 2:
+                continue
+            content = content[1:-1]
+            if 'deobfuscate_string(' in content or content in seen:
+                continue
+            seen.add(content)
+            unique.append(content)
+
+        if unique:
+            decoded = [_decode_escapes(content) for content in unique]
+            with multiprocessing.Pool() as pool:
+                obfuscated_list = pool.map(
+                    partial(_obfuscate_string, key=encryption_key), decoded)
+            obf_map = {content: (obfuscated, len(processed))
+                       for content, obfuscated, processed
+                       in zip(unique, obfuscated_list, decoded)}
+            if verbose:
+                print(f"Obfuscated {len(unique)} unique strings in parallel")
+
+    # The same literal ("\n", "%s", "OK", ...) tends to recur many times in
+    # a file; with a fixed key its replacement is deterministic, so repeats
+    # skip the decode/obfuscate/format work entirely
+    replacement_cache = {}
+
+    # One definition per unique string when the table is enabled; repeated
+    # literals share the same symbol through the replacement cache
+    table_definitions = []
+
+    for string_lit in string_literals:
         string_content = string_lit['text']
-        
+
         # Skip empty strings or very short strings
         if len(string_content) <= 2:  # Just quotes
             continue
-            
+
         # Remove quotes to get actual content
         string_content = string_content[1:-1]
-            
+
         # Skip already processed strings
         if 'deobfuscate_string(' in string_content:
             continue
-            
+
         # Get the start and end positions of the string literal
         start = string_lit['start']
         end = string_lit['end']
-        
-        # Process the string content for length calculation
-        try:
-            processed_string = bytes(string_content, 'utf-8').decode('unicode_escape', errors='replace')
-            actual_length = len(processed_string)
-        except:
-            actual_length = len(string_content)
-        
-        # Obfuscate the string
-        obfuscated = _obfuscate_string(string_content, encryption_key)
-        replacement = f'deobfuscate_string((const unsigned char[]){{{obfuscated}}}, {actual_length})'
-        
-        # Perform the replacement
-        result = result[:start] + replacement + result[end:]
-        
+
+        # Literals on preprocessor lines (#include "x.h", #error "...") must
+        # survive verbatim. One rfind plus a short slice check is far
+        # cheaper than inspecting context with a regex
+        line_start = text.rfind('\n', 0, start) + 1
+        if text[line_start:start].lstrip()[:1] == '#':
+            continue
+
+        replacement = replacement_cache.get(string_content)
+        if replacement is None:
+            prewarmed = obf_map.get(string_content)
+            if prewarmed is not None:
+                obfuscated, actual_length = prewarmed
+            else:
+                # Decode escape sequences once - the same decoded string
+                # feeds both the length calculation and the obfuscation,
+                # instead of each doing its own decode round-trip
+                processed_string = _decode_escapes(string_content)
+                actual_length = len(processed_string)
+
+                # Obfuscate the string
+                obfuscated = _obfuscate_string(processed_string, encryption_key)
+            if use_string_table:
+                # Call sites reference the shared table entry by name; the
+                # byte payload appears once in the generated C instead of
+                # being re-emitted as a compound literal per occurrence
+                symbol = f'_obf_str_{len(table_definitions)}'
+                table_definitions.append(
+                    f'static const unsigned char {symbol}[] = {{{obfuscated}}};')
+                replacement = f'deobfuscate_string({symbol}, {actual_length})'
+            else:
+                replacement = f'deobfuscate_string((const unsigned char[]){{{obfuscated}}}, {actual_length})'
+            replacement_cache[string_content] = replacement
+
+        edits.append((start, end, replacement))
+
         if verbose:
             shortened = string_content[:20] + ('...' if len(string_content) > 20 else '')
             print(f'Obfuscated string: "{shortened}"')
-    
+
+    if not edits:
+        return text
+
+    # Rebuild the text once from the collected edits
+    chunks = []
+    pos = 0
+    for start, end, replacement in edits:
+        chunks.append(text[pos:start])
+        chunks.append(replacement)
+        pos = end
+    chunks.append(text[pos:])
+
+    result = ''.join(chunks)
+
+    # Splice the table definitions in after the last include so every symbol
+    # is defined before its first use
+    if table_definitions:
+        table_block = '/* Obfuscated string table */\n' + '\n'.join(table_definitions) + '\n'
+        include_idx = result.rfind('#include')
+        insert_at = 0
+        if include_idx != -1:
+            line_end = result.find('\n', include_idx)
+            insert_at = len(result) if line_end == -1 else line_end + 1
+        result = result[:insert_at] + table_block + result[insert_at:]
+
+        if verbose:
+            print(f"Emitted {len(table_definitions)} string table entries")
+
     return result
 
 
-def _obfuscate_string(string: str, key: List[int]) -> str:
-    """Obfuscate a string using the encryption key
-    
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _obfuscate_kernel(data, key):
+        """Nopython add-and-mask over a 16-byte key; compiled by Numba"""
+        out = np.empty(data.size, dtype=np.uint8)
+        for i in range(data.size):
+            out[i] = (data[i] + key[i & 15]) & 0xFF
+        return out
+
+
+@lru_cache(maxsize=4)
+def _key_array(key: Tuple[int, ...]):
+    """Return the key as a uint32 ndarray, cached per unique key
+
+    Args:
+        key: Encryption key as a tuple (hashable for the cache)
+
+    Returns:
+        NumPy uint32 array of the key bytes
+    """
+    return np.asarray(key, dtype=np.uint32)
+
+
+def obfuscate_strings_in_stream(input_stream, output_stream, encryption_key: List[int], verbose: bool = False, chunk_size: int = 1 << 20) -> None:
+    """Obfuscate string literals from a stream, one chunk at a time
+
+    Bounds peak memory by the chunk size instead of materializing the whole
+    source plus the rewritten copy. Chunks are cut at newline boundaries -
+    a C string literal cannot span an unescaped newline, so a chunk ending
+    at one never splits a literal in half.
+
+    Args:
+        input_stream: Text stream to read C code from
+        output_stream: Text stream to write obfuscated code to
+        encryption_key: The encryption key to use
+        verbose: Whether to print verbose output
+        chunk_size: How much text to read per iteration
+
+    Returns:
+        None; output is written to output_stream
+    """
+    # The string table numbers its symbols per call, which would collide
+    # across chunks, so the streaming path keeps the inline literal form
+    buffer = ''
+    while True:
+        chunk = input_stream.read(chunk_size)
+        if not chunk:
+            break
+        buffer += chunk
+
+        split_at = buffer.rfind('\n')
+        if split_at == -1:
+            # No safe boundary yet - keep accumulating
+            continue
+
+        output_stream.write(obfuscate_strings_in_text(
+            buffer[:split_at + 1], encryption_key, verbose, use_string_table=False))
+        buffer = buffer[split_at + 1:]
+
+    if buffer:
+        output_stream.write(obfuscate_strings_in_text(
+            buffer, encryption_key, verbose, use_string_table=False))
+
+
+def _vectorized_obfuscate(string: str, key: List[int]) -> List[int]:
+    """Obfuscate a string against a repeating key using NumPy
+
     Args:
         string: String to obfuscate
         key: Encryption key
-        
+
     Returns:
-        Comma-separated string of obfuscated bytes
+        List of obfuscated byte values
+    """
+    # utf-32-le yields one uint32 code point per character without a Python
+    # loop, matching ord() semantics for non-ASCII characters. The key array
+    # is cached per key so only the tiling is allocated per call
+    data = np.frombuffer(string.encode('utf-32-le'), dtype=np.uint32)
+    key_arr = _key_array(tuple(key))
+
+    # The Numba kernel fuses the tiling, add and mask into one compiled
+    # loop with no intermediate arrays; it hard-codes the 16-byte key cycle
+    # (i & 15), so other key lengths take the plain NumPy path
+    if NUMBA_AVAILABLE and key_arr.size == 16:
+        return _obfuscate_kernel(data, key_arr).tolist()
+
+    tiled = np.resize(key_arr, data.size)
+    return ((data + tiled) & 0xFF).tolist()
+
+
+@lru_cache(maxsize=4)
+def _translation_tables(key: Tuple[int, ...]) -> List[bytes]:
+    """Build one 256-entry translate table per key byte
+
+    Args:
+        key: Encryption key as a tuple (hashable for the cache)
+
+    Returns:
+        List of bytes.translate tables, one per key position
+    """
+    return [bytes((i + k) % 256 for i in range(256)) for k in key]
+
+
+# Below this many bytes the 16 strided slice/translate/reassign steps cost
+# more than just looping; short literals take the direct path
+_TRANSLATE_MIN_LENGTH = 32
+
+# All 256 formatted byte literals, built once - formatting then becomes a
+# list index per byte instead of a printf-style call
+_HEX_LITERALS = ['0x%02x' % b for b in range(256)]
+
+
+def _translate_obfuscate(data: bytes, key: List[int]) -> bytearray:
+    """Obfuscate raw bytes against the repeating key with bytes.translate
+
+    Each key lane is processed as a strided slice through its precomputed
+    table - a tight C loop per lane instead of Python arithmetic per byte.
+
+    Args:
+        data: Raw bytes to obfuscate
+        key: Encryption key
+
+    Returns:
+        Obfuscated bytes
     """
-    # Try to handle escape sequences
+    tables = _translation_tables(tuple(key))
+    lanes = len(tables)
+    out = bytearray(len(data))
+    for lane, table in enumerate(tables):
+        out[lane::lanes] = data[lane::lanes].translate(table)
+    return out
+
+
+def _obfuscated_byte_values(string: str, key: List[int]):
+    """Compute the obfuscated byte values for a string against the key
+
+    Single kernel shared by _obfuscate_string and encrypt_string - one place
+    picks the fastest available path (NumPy, bytes.translate, or the plain
+    per-character loop) instead of each caller duplicating the branches.
+
+    Args:
+        string: String to obfuscate
+        key: Encryption key
+
+    Returns:
+        Sequence of obfuscated byte values
+    """
+    if NUMPY_AVAILABLE:
+        return _vectorized_obfuscate(string, key)
+
     try:
-        processed_string = bytes(string, 'utf-8').decode('unicode_escape')
-    except:
-        # If we can't process escape sequences, use the original string
-        processed_string = string
-    
-    # Obfuscate each character
-    obfuscated_bytes = []
-    for i, char in enumerate(processed_string):
-        k = key[i % 16]
-        obfuscated_byte = (ord(char) + k) % 256
-        obfuscated_bytes.append(obfuscated_byte)
-    
-    # Format as comma-separated list
-    return ', '.join(str(b) for b in obfuscated_bytes)
+        # For latin-1 strings the byte values equal ord(), so the
+        # translate tables apply directly
+        data = string.encode('latin-1')
+    except UnicodeEncodeError:
+        # Code points above 255 need per-character ord() arithmetic. A
+        # bytearray stores the result as contiguous raw bytes rather than a
+        # list of boxed ints (~28 bytes of header per element), and cycling
+        # the key with zip drops the per-byte modulo and subscript
+        return bytearray((ord(char) + k) % 256
+                         for char, k in zip(string, cycle(key)))
+
+    if len(data) < _TRANSLATE_MIN_LENGTH:
+        # Most C literals are short; the lane setup doesn't pay for itself
+        return bytearray((b + k) % 256 for b, k in zip(data, cycle(key)))
+
+    return _translate_obfuscate(data, key)
+
+
+def _obfuscate_string(processed_string: str, key: List[int]) -> str:
+    """Obfuscate a string using the encryption key
+
+    Args:
+        processed_string: String to obfuscate, with escape sequences already
+            decoded by the caller
+        key: Encryption key
+
+    Returns:
+        Comma-separated string of obfuscated bytes
+    """
+    # Format as a comma-separated list of fixed-width hex literals - cheaper
+    # to produce than str(int) and more compact in the generated C
+    return ', '.join(map(_HEX_LITERALS.__getitem__, _obfuscated_byte_values(processed_string, key)))
 
 
 def encrypt_string(string, key):
     """Encrypt a string with a key.
-    
+
     Args:
         string: The string to encrypt
         key: The encryption key (list of bytes)
-        
+
     Returns:
         The encrypted string formatted for C code
     """
-    encrypted = []
-    for i, char in enumerate(string):
-        encrypted_byte = (ord(char) + key[i % len(key)]) % 256
-        encrypted.append(encrypted_byte)
-        
     # Format for C code
-    return ', '.join(str(b) for b in encrypted) 
\ No newline at end of file
+    return ', '.join(map(_HEX_LITERALS.__getitem__, _obfuscated_byte_values(string, key)))
\ No newline at end of file